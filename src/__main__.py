@@ -1,3 +1,4 @@
+import logging
 import sys
 from .gui.main_window import MainWindow
 from PyQt5.QtWidgets import QApplication
@@ -7,6 +8,9 @@ def main():
     """
     Initializes and runs the NanoKicker Control Center GUI.
     """
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s %(name)s: %(message)s"
+    )
     app = QApplication(sys.argv)
     window = MainWindow()
     window.show()
@@ -1,4 +1,6 @@
+import logging
 import sys
+import time
 import serial.tools.list_ports
 from PyQt5.QtWidgets import (
     QApplication,
@@ -14,9 +16,11 @@ from PyQt5.QtWidgets import (
 )
 from PyQt5.QtCore import QThread, QObject, pyqtSignal, pyqtSlot, Qt
 
-from motherboard import Motherboard
+from motherboard import Motherboard, TransportError
 from gui.nanokicker_widget import NanoKickerWidget
 
+logger = logging.getLogger(__name__)
+
 
 class Worker(QObject):
     """
@@ -26,21 +30,36 @@ class Worker(QObject):
     ports_found = pyqtSignal(list)
     connection_status = pyqtSignal(bool, str)
     scan_results = pyqtSignal(dict)
+    parameters_ready = pyqtSignal(int)
     finished = pyqtSignal()
 
+    PORTS_CACHE_TTL = 1.0  # seconds a port enumeration is reused for
+
     def __init__(self):
         super().__init__()
         self.motherboard = None
+        self._ports_cache = None
+        self._ports_ts = 0.0
 
     def _handle_disconnect(self):
         """Callback for when motherboard detects disconnection."""
+        self._ports_cache = None  # The device may have been unplugged
         self.connection_status.emit(False, "Connection Lost")
         self.motherboard = None
 
     @pyqtSlot()
     def find_ports(self):
-        ports = [port.device for port in serial.tools.list_ports.comports()]
-        self.ports_found.emit(ports)
+        # Enumerating ports can take 100ms+, so reuse a recent result
+        now = time.monotonic()
+        if (
+            self._ports_cache is None
+            or now - self._ports_ts >= self.PORTS_CACHE_TTL
+        ):
+            self._ports_cache = [
+                port.device for port in serial.tools.list_ports.comports()
+            ]
+            self._ports_ts = now
+        self.ports_found.emit(list(self._ports_cache))
 
     @pyqtSlot(str)
     def connect_motherboard(self, port):
@@ -57,13 +76,32 @@ class Worker(QObject):
     def scan_for_kickers(self):
         if self.motherboard:
             found_kickers = self.motherboard.scan_for_nanokickers()
-            self.scan_results.emit(found_kickers)
+            if self.motherboard:  # The connection may drop mid-scan
+                self.scan_results.emit(found_kickers)
+                self._read_kicker_parameters()
         self.finished.emit()
 
+    def _read_kicker_parameters(self):
+        """Reads each found kicker's parameters here rather than on the GUI thread."""
+        for kicker in list(self.motherboard.nanokickers.values()):
+            if not self.motherboard:
+                break  # Connection lost mid-read
+            # Always re-read: the cached values are only what was last set,
+            # and the device may have been power-cycled since.
+            try:
+                kicker.read_all_parameters()
+            except TransportError as e:
+                logger.warning(
+                    "Could not read NanoKicker #%d: %s", kicker.device_id, e
+                )
+                continue
+            self.parameters_ready.emit(kicker.device_id)
+
     @pyqtSlot()
     def disconnect_motherboard(self):
         if self.motherboard:
             self.motherboard.disconnect()
+        self._ports_cache = None
         self.connection_status.emit(False, "Disconnected")
 
 
@@ -83,6 +121,8 @@ class MainWindow(QMainWindow):
         self.setWindowTitle("NanoKicker Control Center")
         self.setMinimumSize(400, 500)
 
+        self.kicker_widgets = {}  # NanoKickerWidgets by device_id
+
         self._init_ui()
         self._init_worker_thread()
 
@@ -138,10 +178,20 @@ class MainWindow(QMainWindow):
         main_layout.addWidget(scroll_area)
 
         # --- Connections ---
-        self.refresh_button.clicked.connect(self.find_ports)
-        self.connect_button.clicked.connect(self.connect_to_motherboard)
-        self.disconnect_button.clicked.connect(self.disconnect_from_motherboard)
-        self.scan_button.clicked.connect(self.scan_for_kickers)
+        # These stay on the GUI thread, so call the slots directly. Signals
+        # to and from the worker are queued (see _init_worker_thread).
+        self.refresh_button.clicked.connect(
+            self.find_ports, Qt.DirectConnection
+        )
+        self.connect_button.clicked.connect(
+            self.connect_to_motherboard, Qt.DirectConnection
+        )
+        self.disconnect_button.clicked.connect(
+            self.disconnect_from_motherboard, Qt.DirectConnection
+        )
+        self.scan_button.clicked.connect(
+            self.scan_for_kickers, Qt.DirectConnection
+        )
 
     def _init_worker_thread(self):
         self.worker_thread = QThread()
@@ -149,16 +199,34 @@ class MainWindow(QMainWindow):
 
         self.worker.moveToThread(self.worker_thread)
 
-        # Connect worker signals to main thread slots
-        self.worker.ports_found.connect(self.update_port_list)
-        self.worker.connection_status.connect(self.on_connection_status_changed)
-        self.worker.scan_results.connect(self.display_kicker_widgets)
+        # Connect worker signals to main thread slots. Every connection below
+        # crosses threads, so request queued delivery explicitly.
+        self.worker.ports_found.connect(
+            self.update_port_list, Qt.QueuedConnection
+        )
+        self.worker.connection_status.connect(
+            self.on_connection_status_changed, Qt.QueuedConnection
+        )
+        self.worker.scan_results.connect(
+            self.display_kicker_widgets, Qt.QueuedConnection
+        )
+        self.worker.parameters_ready.connect(
+            self.on_parameters_ready, Qt.QueuedConnection
+        )
 
         # Connect main thread signals to worker slots
-        self.trigger_find_ports.connect(self.worker.find_ports)
-        self.trigger_connect.connect(self.worker.connect_motherboard)
-        self.trigger_scan.connect(self.worker.scan_for_kickers)
-        self.trigger_disconnect.connect(self.worker.disconnect_motherboard)
+        self.trigger_find_ports.connect(
+            self.worker.find_ports, Qt.QueuedConnection
+        )
+        self.trigger_connect.connect(
+            self.worker.connect_motherboard, Qt.QueuedConnection
+        )
+        self.trigger_scan.connect(
+            self.worker.scan_for_kickers, Qt.QueuedConnection
+        )
+        self.trigger_disconnect.connect(
+            self.worker.disconnect_motherboard, Qt.QueuedConnection
+        )
 
         self.worker_thread.start()
         self.find_ports()  # Initial port scan
@@ -185,11 +253,13 @@ class MainWindow(QMainWindow):
         self.clear_kicker_widgets()
         self.trigger_scan.emit()
 
+    @pyqtSlot(list)
     def update_port_list(self, ports):
         self.port_combo.clear()
         self.port_combo.addItems(ports)
         self.refresh_button.setEnabled(True)
 
+    @pyqtSlot(bool, str)
     def on_connection_status_changed(self, is_connected, message):
         self.status_label.setText(f"Status: {message}")
         self.connect_button.setEnabled(not is_connected)
@@ -201,6 +271,7 @@ class MainWindow(QMainWindow):
         if not is_connected:
             self.clear_kicker_widgets()
 
+    @pyqtSlot(dict)
     def display_kicker_widgets(self, found_kickers):
         if not found_kickers:
             self.status_label.setText(
@@ -211,17 +282,32 @@ class MainWindow(QMainWindow):
                 f"Status: Connected. Found {len(found_kickers)} device(s)."
             )
 
+        # The worker reads each device's parameters next and reports back
+        # through parameters_ready, so don't block here reading them.
         for device_id, kicker_obj in found_kickers.items():
-            kicker_widget = NanoKickerWidget(kicker_obj)
+            kicker_widget = NanoKickerWidget(kicker_obj, defer_read=True)
+            self.kicker_widgets[device_id] = kicker_widget
             self.kicker_layout.addWidget(kicker_widget)
 
         self.scan_button.setEnabled(True)
 
+    @pyqtSlot(int)
+    def on_parameters_ready(self, device_id):
+        kicker_widget = self.kicker_widgets.get(device_id)
+        if kicker_widget:
+            kicker_widget.update_from_device()
+
     def clear_kicker_widgets(self):
+        self.kicker_widgets.clear()
+        # Suspend repaints so removing N widgets costs one relayout, not N
+        self.kicker_container.setUpdatesEnabled(False)
         while self.kicker_layout.count():
             child = self.kicker_layout.takeAt(0)
-            if child.widget():
-                child.widget().deleteLater()
+            widget = child.widget()
+            if widget:
+                widget.setParent(None)
+                widget.deleteLater()
+        self.kicker_container.setUpdatesEnabled(True)
 
     def closeEvent(self, event):
         """Ensure worker thread is cleaned up on exit."""
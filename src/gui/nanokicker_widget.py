@@ -1,3 +1,6 @@
+import logging
+import struct
+
 from PyQt5.QtWidgets import (
     QWidget,
     QVBoxLayout,
@@ -10,16 +13,29 @@ from PyQt5.QtWidgets import (
     QComboBox,
     QCheckBox,
 )
-from PyQt5.QtCore import Qt, QPropertyAnimation, QEasingCurve
+from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QIntValidator, QDoubleValidator
 
+from motherboard import TransportError
+
+logger = logging.getLogger(__name__)
+
 
 class NanoKickerWidget(QFrame):
     """
     A collapsible widget to control a single NanoKicker device.
+
+    With defer_read=True the widget is built without touching the serial
+    port; call update_from_device() once the parameters have been read.
     """
 
-    def __init__(self, nanokicker_device, parent=None):
+    # Validators hold no per-widget state, so every instance shares these
+    _FREQ_VALIDATOR = QIntValidator(0, 200000)  # Freq range
+    _AMP_VALIDATOR = QDoubleValidator(0.0, 24.0, 2)  # Amplitude range
+    _DOUBLE_VALIDATOR = QDoubleValidator()
+    _WIPER_VALIDATOR = QIntValidator(0, 2**31 - 1)  # Sent unsigned
+
+    def __init__(self, nanokicker_device, parent=None, defer_read=False):
         super().__init__(parent)
         self.nanokicker = nanokicker_device
         self.is_expanded = True
@@ -27,6 +43,9 @@ class NanoKickerWidget(QFrame):
         self._init_ui()
         self.setFrameShape(QFrame.StyledPanel)
 
+        if not defer_read:
+            self.get_parameters()
+
     def _init_ui(self):
         layout = QVBoxLayout(self)
         layout.setContentsMargins(0, 0, 0, 0)
@@ -51,19 +70,18 @@ class NanoKickerWidget(QFrame):
         # --- Content Area ---
         self.content_area = QWidget()
         content_layout = QGridLayout(self.content_area)
+        self.content_layout = content_layout
 
         # Frequency
         content_layout.addWidget(QLabel("Frequency (Hz):"), 0, 0)
         self.freq_input = QLineEdit()
-        self.freq_input.setValidator(QIntValidator(0, 200000))  # Freq range
+        self.freq_input.setValidator(self._FREQ_VALIDATOR)
         content_layout.addWidget(self.freq_input, 0, 1)
 
         # Amplitude
         content_layout.addWidget(QLabel("Amplitude:"), 1, 0)
         self.amp_input = QLineEdit()
-        self.amp_input.setValidator(
-            QDoubleValidator(0.0, 24.0, 2)
-        )  # Amplitude range
+        self.amp_input.setValidator(self._AMP_VALIDATOR)
         content_layout.addWidget(self.amp_input, 1, 1)
 
         # Mode
@@ -86,8 +104,21 @@ class NanoKickerWidget(QFrame):
         self.advanced_checkbox = QCheckBox("Advanced Settings")
         content_layout.addWidget(self.advanced_checkbox, 4, 0, 1, 2)
 
+        # Built on first use by _init_advanced_ui; most widgets never need it
+        self.advanced_frame = None
+
+        layout.addWidget(self.title_bar)
+        layout.addWidget(self.content_area)
+
+        # --- Connections ---
+        self.toggle_button.clicked.connect(self.toggle_view)
+        self.set_button.clicked.connect(self.set_parameters)
+        self.get_button.clicked.connect(self.get_parameters)
+
+        self.advanced_checkbox.toggled.connect(self.toggle_advanced)
+
+    def _init_advanced_ui(self):
         self.advanced_frame = QFrame()
-        self.advanced_frame.setVisible(False)
         adv_layout = QGridLayout(self.advanced_frame)
         adv_layout.setContentsMargins(0, 5, 0, 0)
 
@@ -96,32 +127,32 @@ class NanoKickerWidget(QFrame):
 
         adv_layout.addWidget(QLabel("Vin:"), 1, 0)
         self.vin_input = QLineEdit()
-        self.vin_input.setValidator(QDoubleValidator())
+        self.vin_input.setValidator(self._DOUBLE_VALIDATOR)
         adv_layout.addWidget(self.vin_input, 1, 1)
 
         adv_layout.addWidget(QLabel("Vout:"), 2, 0)
         self.vout_input = QLineEdit()
-        self.vout_input.setValidator(QDoubleValidator())
+        self.vout_input.setValidator(self._DOUBLE_VALIDATOR)
         adv_layout.addWidget(self.vout_input, 2, 1)
 
         adv_layout.addWidget(QLabel("Pot Range:"), 3, 0)
         self.pot_range_input = QLineEdit()
-        self.pot_range_input.setValidator(QDoubleValidator())
+        self.pot_range_input.setValidator(self._DOUBLE_VALIDATOR)
         adv_layout.addWidget(self.pot_range_input, 3, 1)
 
         adv_layout.addWidget(QLabel("R_G Trim:"), 4, 0)
         self.rg_trim_input = QLineEdit()
-        self.rg_trim_input.setValidator(QDoubleValidator())
+        self.rg_trim_input.setValidator(self._DOUBLE_VALIDATOR)
         adv_layout.addWidget(self.rg_trim_input, 4, 1)
 
         adv_layout.addWidget(QLabel("R_F Trim:"), 5, 0)
         self.rf_trim_input = QLineEdit()
-        self.rf_trim_input.setValidator(QDoubleValidator())
+        self.rf_trim_input.setValidator(self._DOUBLE_VALIDATOR)
         adv_layout.addWidget(self.rf_trim_input, 5, 1)
 
         adv_layout.addWidget(QLabel("Wiper:"), 6, 0)
         self.wiper_input = QLineEdit()
-        self.wiper_input.setValidator(QIntValidator())
+        self.wiper_input.setValidator(self._WIPER_VALIDATOR)
         adv_layout.addWidget(self.wiper_input, 6, 1)
 
         adv_btns = QHBoxLayout()
@@ -133,47 +164,27 @@ class NanoKickerWidget(QFrame):
         adv_btns.addWidget(self.load_mem_btn)
         adv_layout.addLayout(adv_btns, 7, 0, 1, 2)
 
-        content_layout.addWidget(self.advanced_frame, 7, 0, 1, 2)
+        self.content_layout.addWidget(self.advanced_frame, 7, 0, 1, 2)
 
-        layout.addWidget(self.title_bar)
-        layout.addWidget(self.content_area)
-
-        # --- Connections ---
-        self.toggle_button.clicked.connect(self.toggle_view)
-        self.set_button.clicked.connect(self.set_parameters)
-        self.get_button.clicked.connect(self.get_parameters)
-
-        self.advanced_checkbox.toggled.connect(self.toggle_advanced)
         self.set_adv_btn.clicked.connect(self.set_advanced_parameters)
         self.save_mem_btn.clicked.connect(self.save_to_memory)
         self.load_mem_btn.clicked.connect(self.load_from_memory)
 
-        # --- Animation Setup for Collapsing ---
-        self.animation = QPropertyAnimation(self.content_area, b"maximumHeight")
-        self.animation.setDuration(300)
-        self.animation.setEasingCurve(QEasingCurve.InOutQuart)
-
-        self.get_parameters()
-
     # --- UI Slots and Actions ---
 
     def toggle_view(self):
         self.is_expanded = not self.is_expanded
-        if self.is_expanded:
-            self.toggle_button.setText("▼")
-            self.animation.setStartValue(0)
-            self.animation.setEndValue(self.content_area.sizeHint().height())
-        else:
-            self.toggle_button.setText("▶")
-            self.animation.setStartValue(self.content_area.sizeHint().height())
-            self.animation.setEndValue(0)
-        self.animation.start()
+        self.content_area.setVisible(self.is_expanded)
+        self.toggle_button.setText("▼" if self.is_expanded else "▶")
 
     def toggle_advanced(self, checked):
+        if self.advanced_frame is None:
+            if not checked:
+                return
+            self._init_advanced_ui()
+            if self.nanokicker.frequency is not None:
+                self._update_advanced_from_device()
         self.advanced_frame.setVisible(checked)
-        if self.is_expanded:
-            # Allow the area to expand to fit the new content
-            self.content_area.setMaximumHeight(16777215)
 
     def set_parameters(self):
         """Read values from UI and send them to the device."""
@@ -185,31 +196,38 @@ class NanoKickerWidget(QFrame):
             mode_map = {0: 0, 1: 1, 2: 2, 3: 4}
             mode = mode_map.get(self.mode_combo.currentIndex(), 0)
 
-            self.nanokicker.set_frequency(freq)
-            self.nanokicker.set_amplitude(amp)
-            self.nanokicker.set_mode(mode)
+            with self.nanokicker.batch():
+                self.nanokicker.set_frequency(freq)
+                self.nanokicker.set_amplitude(amp)
+                self.nanokicker.set_mode(mode)
 
         except ValueError:
             print("Error: Invalid input for frequency or amplitude.")
 
     def set_advanced_parameters(self):
         try:
-            # self.nanokicker.set_startup_enabled(self.startup_check.isChecked())
-            if self.vin_input.text():
-                self.nanokicker.set_vin(float(self.vin_input.text()))
-            if self.vout_input.text():
-                self.nanokicker.set_vout(float(self.vout_input.text()))
-            if self.pot_range_input.text():
-                self.nanokicker.set_pot_range(
-                    float(self.pot_range_input.text())
-                )
-            if self.rg_trim_input.text():
-                self.nanokicker.set_r_g_trim(float(self.rg_trim_input.text()))
-            if self.rf_trim_input.text():
-                self.nanokicker.set_r_f_trim(float(self.rf_trim_input.text()))
-            if self.wiper_input.text():
-                self.nanokicker.set_wiper(int(self.wiper_input.text()))
-        except ValueError:
+            with self.nanokicker.batch():
+                # self.nanokicker.set_startup_enabled(self.startup_check.isChecked())
+                if self.vin_input.text():
+                    self.nanokicker.set_vin(float(self.vin_input.text()))
+                if self.vout_input.text():
+                    self.nanokicker.set_vout(float(self.vout_input.text()))
+                if self.pot_range_input.text():
+                    self.nanokicker.set_pot_range(
+                        float(self.pot_range_input.text())
+                    )
+                if self.rg_trim_input.text():
+                    self.nanokicker.set_r_g_trim(
+                        float(self.rg_trim_input.text())
+                    )
+                if self.rf_trim_input.text():
+                    self.nanokicker.set_r_f_trim(
+                        float(self.rf_trim_input.text())
+                    )
+                if self.wiper_input.text():
+                    self.nanokicker.set_wiper(int(self.wiper_input.text()))
+        except (ValueError, struct.error):
+            # struct.error: a value the wire format can't carry
             print("Error: Invalid input for advanced parameters.")
 
     def save_to_memory(self):
@@ -221,8 +239,19 @@ class NanoKickerWidget(QFrame):
 
     def get_parameters(self):
         """Read parameters from device and update the UI."""
-        self.nanokicker.read_all_parameters()
+        try:
+            self.nanokicker.read_all_parameters()
+        except TransportError as e:
+            logger.warning(
+                "Could not read NanoKicker #%d: %s",
+                self.nanokicker.device_id,
+                e,
+            )
+            return
+        self.update_from_device()
 
+    def update_from_device(self):
+        """Update the UI from the parameters last read from the device."""
         self.freq_input.setText(str(self.nanokicker.frequency or 0))
         self.amp_input.setText(f"{self.nanokicker.amplitude or 0:.2f}")
 
@@ -233,7 +262,10 @@ class NanoKickerWidget(QFrame):
                 mode_map.get(self.nanokicker.mode, 0)
             )
 
-        # Advanced
+        if self.advanced_frame is not None:
+            self._update_advanced_from_device()
+
+    def _update_advanced_from_device(self):
         self.startup_check.setChecked(bool(self.nanokicker.startup_enabled))
         self.vin_input.setText(f"{self.nanokicker.vin or 0.0:.2f}")
         self.vout_input.setText(f"{self.nanokicker.vout or 0.0:.2f}")
@@ -1,9 +1,52 @@
+"""
+Serial interface to the NanoKicker motherboard.
+
+Performance note: the hot paths here are bound by serial round-trip time
+(roughly 1ms per request/response on USB CDC), not by Python CPU time. Speed
+things up by doing fewer round-trips: batch getters into one exchange
+(send_command_batch), keep scan timeouts short (SCAN_TIMEOUT), and lower the
+USB latency timer (_set_low_latency). cProfile alone is misleading, since most
+wall time is spent blocked in the serial read; use `strace -T` or a USB capture
+(e.g. Wireshark) to see where the time goes.
+"""
+
+import array
+import logging
+import os
+import select
 import serial
 import struct
+import sys
+import threading
 import time
 from serial.tools.list_ports import comports
 import nanokicker
 
+logger = logging.getLogger(__name__)
+
+# Wire formats: command frame (device_id, action, value) and getter response
+_CMD_STRUCT = struct.Struct(">BBI")
+_RESP_STRUCT = struct.Struct(">I")
+
+# Raw getter replies that mean "no device". Text errors (e.g. "-2\r\n") are
+# caught by their leading b"-"; this covers the remaining binary one.
+_ERROR_RESPONSES = frozenset({b"\xfe\xff\xff\xff"})
+
+
+class TransportError(Exception):
+    """Raised when a getter command gets no valid response from the motherboard."""
+
+
+def _pack_commands(device_id: int, entries):
+    """Packs (action, value) pairs for one device into a single wire buffer."""
+    entries = tuple(entries)
+    buf = bytearray(_CMD_STRUCT.size * len(entries))
+    for offset, (action, value) in zip(
+        range(0, len(buf), _CMD_STRUCT.size), entries
+    ):
+        _CMD_STRUCT.pack_into(buf, offset, device_id, action, value)
+    return buf
+
 
 class Motherboard:
     """
@@ -11,12 +54,17 @@ class Motherboard:
     """
 
     MAX_DEVICES = 20
+    SCAN_TIMEOUT = 0.02  # Per-device read timeout (seconds) while scanning
+    SCAN_SETTLE = 0.05  # Extra wait (seconds) for a reply that missed it
 
     def __init__(self, port: str = None, disconnect_callback=None):
         self.port = port
         self.serial = None
         self.nanokickers = {}  # Using a dict to store kickers by device_id
         self.disconnect_callback = disconnect_callback
+        # The GUI and worker threads share the port; hold this for a whole
+        # request/response exchange so their bytes never interleave.
+        self._lock = threading.RLock()
 
         if not self.port:
             self.port = self._find_pico_port()
@@ -24,37 +72,124 @@ class Motherboard:
         if self.port:
             self.connect()
         else:
-            print("Error: Could not find Raspberry Pi Pico motherboard.")
+            logger.error("Could not find Raspberry Pi Pico motherboard.")
 
     def _find_pico_port(self):
         """Automatically find the COM port for the Raspberry Pi Pico."""
-        print("Searching for Raspberry Pi Pico motherboard...")
+        logger.info("Searching for Raspberry Pi Pico motherboard...")
         ports = comports()
         for port in ports:
             if "Pico" in port.description or "Serial" in port.description:
-                print(f"Found motherboard on {port.device}")
+                logger.info("Found motherboard on %s", port.device)
                 return port.device
         return None
 
     def connect(self):
         """Establishes a serial connection with the motherboard."""
         if not self.port:
-            print("Error: No serial port specified or found.")
+            logger.error("No serial port specified or found.")
             return
         try:
             # The motherboard firmware doesn't care about the baud rate for USB CDC
             self.serial = serial.Serial(self.port, timeout=1)
-            print(f"Successfully connected to {self.port}")
+            # Discard anything the firmware printed before we connected. After
+            # this, every reply is consumed by the command that triggered it.
+            self.serial.reset_input_buffer()
+            self._set_low_latency()
+            logger.info("Successfully connected to %s", self.port)
         except serial.SerialException as e:
             self.serial = None
-            print(f"Error opening serial port {self.port}: {e}")
+            logger.error("Error opening serial port %s: %s", self.port, e)
+
+    def _set_low_latency(self):
+        """
+        Best-effort reduction of USB-serial receive latency (Linux only).
+
+        USB-serial adapters hold received bytes for up to latency_timer ms
+        (16 by default) before passing them on, which puts a floor under every
+        request/response. Both tweaks below are skipped silently when the
+        driver doesn't support them or we lack permission.
+        """
+        if not sys.platform.startswith("linux"):
+            return
+
+        tty = os.path.basename(os.path.realpath(self.port))
+        try:
+            with open(
+                f"/sys/bus/usb-serial/devices/{tty}/latency_timer", "w"
+            ) as f:
+                f.write("1")
+        except OSError:
+            pass  # Not a usb-serial device (e.g. CDC-ACM) or not writable
+
+        try:
+            import fcntl
+            import termios
+
+            ASYNC_LOW_LATENCY = 1 << 13
+            buf = array.array("i", [0] * 64)
+            fcntl.ioctl(self.serial.fileno(), termios.TIOCGSERIAL, buf)
+            buf[4] |= ASYNC_LOW_LATENCY  # serial_struct.flags
+            fcntl.ioctl(self.serial.fileno(), termios.TIOCSSERIAL, buf)
+        except (ImportError, AttributeError, OSError):
+            pass
 
     def disconnect(self):
         """Closes the serial connection."""
-        if self.serial and self.serial.is_open:
-            self.serial.close()
-            print("Disconnected from motherboard.")
-            self.serial = None
+        with self._lock:
+            if self.serial and self.serial.is_open:
+                self.serial.close()
+                logger.info("Disconnected from motherboard.")
+                self.serial = None
+
+    def _send(self, device_id: int, action: int, value: int = 0):
+        """Packs and writes a single command frame to the motherboard."""
+        command = _CMD_STRUCT.pack(device_id, action, value)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Sending command: %s", command.hex())
+        self.serial.write(command)
+
+    def _drain_input(self):
+        """Discards unsolicited bytes (e.g. firmware debug text) already received."""
+        pending = self.serial.in_waiting
+        if pending:
+            self.serial.read(pending)
+
+    def _read_response(self, timeout: float = None):
+        """
+        Reads a 4-byte getter response. May return fewer bytes on timeout.
+
+        If timeout is given, wait at most that long for the response to start
+        instead of the port-wide timeout.
+        """
+        if timeout is None:
+            return self.serial.read(_RESP_STRUCT.size)
+
+        if os.name == "posix":
+            # Poll with a deadline rather than reconfiguring the port
+            readable, _, _ = select.select(
+                [self.serial.fileno()], [], [], timeout
+            )
+            if not readable:
+                return b""
+            return self.serial.read(_RESP_STRUCT.size)
+
+        # select() doesn't work on serial handles elsewhere (e.g. Windows)
+        port_timeout = self.serial.timeout
+        self.serial.timeout = timeout
+        try:
+            return self.serial.read(_RESP_STRUCT.size)
+        finally:
+            self.serial.timeout = port_timeout
+
+    def _query(
+        self, device_id: int, action: int, value: int = 0, timeout: float = None
+    ):
+        """Sends a getter command and returns the raw response (short on timeout)."""
+        with self._lock:
+            self._drain_input()
+            self._send(device_id, action, value)
+            return self._read_response(timeout)
 
     def send_command(
         self,
@@ -74,88 +209,212 @@ class Motherboard:
 
         Returns:
             The integer response from the device if read_response is True, otherwise None.
+
+        Raises:
+            TransportError: If read_response is True and no valid response was
+                received (not connected, timeout, or serial failure).
         """
-        if not (self.serial and self.serial.is_open):
-            print("Error: Not connected to motherboard.")
-            return None
+        with self._lock:
+            if not (self.serial and self.serial.is_open):
+                if read_response:
+                    # The caller reports it; logging here too would double up
+                    raise TransportError("Not connected to motherboard.")
+                logger.error("Not connected to motherboard.")
+                return None
 
-        command = struct.pack(">BBI", device_id, action, value)
-        print(f"Sending command: {command.hex()}")
+            try:
+                # Drop stale data or debug messages without a blocking buffer reset
+                self._drain_input()
+                self._send(device_id, action, value)
 
-        try:
-            # Clear the input buffer to ensure we don't read stale data or debug messages
-            self.serial.reset_input_buffer()
-            self.serial.write(command)
-            self.serial.flush()
-
-            # The motherboard firmware prints debug messages. We'll read them to keep the buffer clean.
-            # We expect a specific response for "get" commands, or just debug text for "set" commands.
-            if read_response:
-                # For getters, the firmware sends back a 4-byte value directly.
-                response_bytes = self.serial.read(4)
-                if len(response_bytes) == 4:
-                    response = struct.unpack(">I", response_bytes)[0]
-                    print(f"Motherboard response: {response_bytes}")
-                    print(f"Motherboard response (int): {response}")
-                    return response
+                # The motherboard firmware prints debug messages. We'll read them to keep the buffer clean.
+                # We expect a specific response for "get" commands, or just debug text for "set" commands.
+                if read_response:
+                    # For getters, the firmware sends back a 4-byte value directly.
+                    response_bytes = self._read_response()
+                    if len(response_bytes) == _RESP_STRUCT.size:
+                        response = _RESP_STRUCT.unpack(response_bytes)[0]
+                        logger.debug(
+                            "Motherboard response: %s (int: %d)",
+                            response_bytes,
+                            response,
+                        )
+                        return response
+                    else:
+                        # Also log any text that came instead of the bytes
+                        if logger.isEnabledFor(logging.DEBUG):
+                            logger.debug(
+                                "Motherboard (unexpected response): %s",
+                                response_bytes.decode(
+                                    "utf-8", errors="replace"
+                                ).strip(),
+                            )
+                        raise TransportError(
+                            f"Expected {_RESP_STRUCT.size} response bytes from "
+                            f"device {device_id}, got {len(response_bytes)}"
+                        )
                 else:
-                    # Also print any text that came instead of the bytes
-                    print(
-                        f"Motherboard (unexpected response): {response_bytes.decode('utf-8').strip()}"
-                    )
+                    # For setters, we just read the line of text it sends back.
+                    # This has a timeout, so it won't block forever.
+                    line = self.serial.readline().decode("utf-8").strip()
+                    if "error" in line:
+                        logger.error("Motherboard Error: %s", line)
                     return None
-            else:
-                # For setters, we just read the line of text it sends back.
-                # This has a timeout, so it won't block forever.
-                line = self.serial.readline().decode("utf-8").strip()
-                if "error" in line:
-                    print(f"Motherboard Error: {line}")
+
+            except serial.SerialException as e:
+                self._handle_serial_error(e)
+                if read_response:
+                    raise TransportError(str(e)) from e
                 return None
 
-        except serial.SerialException as e:
-            print(f"Serial error during command send: {e}")
-            if self.serial is not None:
-                self.disconnect()
-                if self.disconnect_callback:
-                    self.disconnect_callback()
-            return None
+    def _exchange_bulk(self, device_id: int, actions):
+        """Writes several getters in one go and returns their raw responses."""
+        with self._lock:
+            if not (self.serial and self.serial.is_open):
+                raise TransportError("Not connected to motherboard.")
+
+            commands = _pack_commands(
+                device_id, ((action, 0) for action in actions)
+            )
+            expected = _RESP_STRUCT.size * len(actions)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Sending commands: %s", commands.hex())
+
+            try:
+                self._drain_input()
+                self.serial.write(commands)
+                response_bytes = self.serial.read(expected)
+            except serial.SerialException as e:
+                self._handle_serial_error(e)
+                raise TransportError(str(e)) from e
+
+            if len(response_bytes) != expected:
+                raise TransportError(
+                    f"Expected {expected} response bytes from device "
+                    f"{device_id}, got {len(response_bytes)}"
+                )
+            return response_bytes
+
+    def send_command_batch(self, device_id: int, actions):
+        """
+        Sends several getter commands to one device in a single write and reads
+        all of their responses back in a single read.
+
+        Args:
+            device_id: The ID of the target NanoKicker (0-19).
+            actions: The getter action codes to send, in order.
+
+        Returns:
+            A tuple with the integer response to each action.
+
+        Raises:
+            TransportError: If not connected or the full response did not arrive.
+        """
+        response_bytes = self._exchange_bulk(device_id, actions)
+        return tuple(
+            value for (value,) in _RESP_STRUCT.iter_unpack(response_bytes)
+        )
+
+    def submit_batch(self, device_id: int, entries):
+        """
+        Sends several setter commands to one device in a single write, then
+        reads the acknowledgement line for each.
+
+        Args:
+            device_id: The ID of the target NanoKicker (0-19).
+            entries: The (action, value) pairs to send, in order.
+        """
+        with self._lock:
+            if not (self.serial and self.serial.is_open):
+                logger.error("Not connected to motherboard.")
+                return
+
+            commands = _pack_commands(device_id, entries)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Sending commands: %s", commands.hex())
+
+            try:
+                self._drain_input()
+                self.serial.write(commands)
+                for _ in range(len(commands) // _CMD_STRUCT.size):
+                    line = self.serial.readline().decode("utf-8").strip()
+                    if "error" in line:
+                        logger.error("Motherboard Error: %s", line)
+            except serial.SerialException as e:
+                self._handle_serial_error(e)
+
+    def _handle_serial_error(self, error):
+        """Tears down the connection after a serial failure and notifies the owner."""
+        logger.error("Serial error during command send: %s", error)
+        if self.serial is not None:
+            self.disconnect()
+            if self.disconnect_callback:
+                self.disconnect_callback()
 
     def scan_for_nanokickers(self):
         """
         Scans for connected NanoKicker devices by pinging each possible ID.
         A 'ping' is a 'get_mode' command, as it's a simple read operation.
+        Returns the found NanoKickers by device_id.
         """
         if not (self.serial and self.serial.is_open):
-            print("Error: Not connected to motherboard.")
+            logger.error("Not connected to motherboard.")
             return
 
-        print(f"Scanning for NanoKickers (0-{self.MAX_DEVICES - 1})...")
-        self.nanokickers.clear()
-
-        # 758254858 is the integer representation of "-2\r\n" (Big Endian), likely an error code.
-        ERROR_RESPONSE_MINUS_1 = 758254857
-        ERROR_RESPONSE_MINUS_2 = 4278190079
-        ERROR_RESPONSE_MINUS_3 = 758254859
+        logger.info("Scanning for NanoKickers (0-%d)...", self.MAX_DEVICES - 1)
+        # Kickers that answer again keep their object; the caller re-reads
+        # their parameters, since the device may have changed since
+        found_ids = set()
 
         for i in range(self.MAX_DEVICES):
             # The motherboard firmware handshake is the most reliable way to check for a device.
             # Pinging for a value is the next best thing. We'll try to get the mode.
             # A successful response indicates a device is present.
-            print(f"Pinging device {i}...")
-            response = self.send_command(
-                device_id=i, action=21, read_response=True
-            )  # action 21 is GET_MODE
-
-            print("Response:", response)
-            if response is not None and response != ERROR_RESPONSE_MINUS_2:
-                print(f"Found NanoKicker at device_id {i}")
-                kicker = nanokicker.NanoKicker(device_id=i, motherboard=self)
-                kicker.mode = response  # We already have the mode, so store it.
-                self.nanokickers[i] = kicker
+            logger.debug("Pinging device %d...", i)
+            try:
+                # Per ping, so the GUI can use the port between devices
+                with self._lock:
+                    # Present and absent devices (see _ERROR_RESPONSES) both
+                    # answer promptly, so use a short deadline.
+                    response_bytes = self._query(
+                        i, nanokicker.Action.GET_MODE, timeout=self.SCAN_TIMEOUT
+                    )
+                    if len(response_bytes) < _RESP_STRUCT.size:
+                        # Replies carry no device id, so a late one must be
+                        # collected now or it would answer the next ID's ping.
+                        time.sleep(self.SCAN_SETTLE)
+                        missing = _RESP_STRUCT.size - len(response_bytes)
+                        response_bytes += self.serial.read(
+                            min(self.serial.in_waiting, missing)
+                        )
+                        self._drain_input()
+            except serial.SerialException as e:
+                self._handle_serial_error(e)
+                break
 
-            time.sleep(0.05)  # Small delay to not overwhelm the serial port
+            logger.debug("Response: %s", response_bytes)
+            # Test the raw bytes so error replies are never unpacked
+            if (
+                len(response_bytes) == _RESP_STRUCT.size
+                and response_bytes[:1] != b"-"
+                and response_bytes not in _ERROR_RESPONSES
+            ):
+                logger.info("Found NanoKicker at device_id %d", i)
+                kicker = self.nanokickers.get(i)
+                if kicker is None:
+                    kicker = nanokicker.NanoKicker(
+                        device_id=i, motherboard=self
+                    )
+                    self.nanokickers[i] = kicker
+                # We already have the mode, so store it.
+                kicker.mode = _RESP_STRUCT.unpack(response_bytes)[0]
+                found_ids.add(i)
+        else:
+            for device_id in list(self.nanokickers):
+                if device_id not in found_ids:
+                    del self.nanokickers[device_id]
 
-        print(f"Scan complete. Found {len(self.nanokickers)} device(s).")
+        logger.info("Scan complete. Found %d device(s).", len(self.nanokickers))
         return self.nanokickers
 
     def __getitem__(self, key):
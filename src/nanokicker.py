@@ -1,175 +1,315 @@
+import array
+import logging
 import struct
+from contextlib import contextmanager
+from enum import IntEnum
+
+logger = logging.getLogger(__name__)
+
+
+class Action(IntEnum):
+    """Command action codes understood by the motherboard firmware."""
+
+    SET_MODE = 1
+    SET_FREQUENCY = 2
+    SET_AMPLITUDE = 3
+    SET_WIPER = 4
+    SET_STARTUP_ENABLED = 11
+    SET_VIN = 12
+    SET_VOUT = 13
+    SET_POT_RANGE = 14
+    SET_R_G_TRIM = 15
+    SET_R_F_TRIM = 16
+    SAVE_SETTINGS = 17
+    LOAD_SETTINGS = 18
+    GET_MODE = 21
+    GET_FREQUENCY = 22
+    GET_AMPLITUDE = 23
+    GET_WIPER = 24
+    GET_STARTUP_ENABLED = 31
+    GET_VIN = 32
+    GET_VOUT = 33
+    GET_POT_RANGE = 34
+    GET_R_G_TRIM = 35
+    GET_R_F_TRIM = 36
+
+
+# Getter actions fetched by read_all_parameters, in response order. The
+# integer parameters come first so the float ones can be converted as a block.
+_ALL_PARAMS_ACTIONS = (
+    Action.GET_MODE,
+    Action.GET_FREQUENCY,
+    Action.GET_STARTUP_ENABLED,
+    Action.GET_WIPER,
+    Action.GET_AMPLITUDE,
+    Action.GET_VIN,
+    Action.GET_VOUT,
+    Action.GET_POT_RANGE,
+    Action.GET_R_G_TRIM,
+    Action.GET_R_F_TRIM,
+)
+_NUM_INT_PARAMS = 4
+
+# IEEE 754 single precision and its bit pattern, for the float<->int helpers
+_F32_STRUCT = struct.Struct("<f")
+_U32_STRUCT = struct.Struct("<I")
+
+
+def _float_to_int(value: float) -> int:
+    """Reinterprets the bits of a float as an integer (IEEE 754 Little Endian)."""
+    return _U32_STRUCT.unpack(_F32_STRUCT.pack(value))[0]
+
+
+def _int_to_float(value: int) -> float:
+    """Reinterprets the bits of an integer as a float (IEEE 754 Little Endian)."""
+    return _F32_STRUCT.unpack(_U32_STRUCT.pack(value))[0]
+
+
+def ints_to_floats(values) -> list:
+    """
+    Reinterprets the bits of many 32-bit integers as floats in one pass.
+
+    Equivalent to applying _int_to_float to each value, but the conversion
+    happens in a single buffer cast rather than one struct round trip each.
+    """
+    return memoryview(array.array("I", values)).cast("B").cast("f").tolist()
 
 
 class NanoKicker:
     """A class to represent and control a single NanoKicker device."""
 
+    __slots__ = (
+        "device_id",
+        "motherboard",
+        "mode",
+        "frequency",
+        "amplitude",
+        "startup_enabled",
+        "vin",
+        "vout",
+        "pot_range",
+        "r_g_trim",
+        "r_f_trim",
+        "wiper",
+        "_send",
+        "_pending",
+    )
+
+    MAX_BATCH_SIZE = 16  # Queued setters are flushed once this many build up
+
+    _REPR_TMPL = "NanoKicker(device_id={}, mode={}, frequency={}, amplitude={})"
+
     def __init__(self, device_id: int, motherboard):
-        if not (0 <= device_id < 20):
+        if device_id not in range(20):
             raise ValueError("Device ID must be between 0 and 19.")
 
         self.device_id = device_id
         self.motherboard = motherboard
 
         # --- Device State ---
-        self.mode = None
-        self.frequency = None
-        self.amplitude = None
-        self.startup_enabled = None
-        self.vin = None
-        self.vout = None
-        self.pot_range = None
-        self.r_g_trim = None
-        self.r_f_trim = None
-        self.wiper = None
-
-    def _send_command(
-        self, action: int, value: int = 0, read_response: bool = False
+        (
+            self.mode,
+            self.frequency,
+            self.amplitude,
+            self.startup_enabled,
+            self.vin,
+            self.vout,
+            self.pot_range,
+            self.r_g_trim,
+            self.r_f_trim,
+            self.wiper,
+        ) = (None,) * 10
+
+        # The motherboard's send_command, bound once. begin_batch() swaps in
+        # _queue_command until end_batch().
+        self._send = motherboard.send_command
+        # (action, value) setter commands queued between begin/end_batch
+        self._pending = None
+
+    def _queue_command(
+        self,
+        device_id: int,
+        action: int,
+        value: int = 0,
+        read_response: bool = False,
     ):
-        """Wrapper to call the motherboard's send_command method."""
-        return self.motherboard.send_command(
-            self.device_id, action, value, read_response
-        )
-
-    def _float_to_int(self, value: float) -> int:
-        """Reinterprets the bits of a float as an integer (IEEE 754 Little Endian)."""
-        return struct.unpack("<I", struct.pack("<f", value))[0]
-
-    def _int_to_float(self, value: int) -> float:
-        """Reinterprets the bits of an integer as a float (IEEE 754 Little Endian)."""
-        return struct.unpack("<f", struct.pack("<I", value))[0]
+        """Stands in for the motherboard's send_command while batching."""
+        if read_response:
+            # Keep commands in order: queued setters go out before a getter
+            self._flush_batch()
+            return self.motherboard.send_command(
+                device_id, action, value, read_response
+            )
+        self._pending.append((action, value))
+        if len(self._pending) >= self.MAX_BATCH_SIZE:
+            self._flush_batch()
+        return None
+
+    def _flush_batch(self):
+        if self._pending:
+            # Detach the queue first so a failed send can't be retried forever
+            pending, self._pending = self._pending, []
+            self.motherboard.submit_batch(self.device_id, pending)
+
+    def begin_batch(self):
+        """Queues subsequent setter commands until end_batch() is called."""
+        if self._pending is None:
+            self._pending = []
+            self._send = self._queue_command
+
+    def end_batch(self):
+        """Sends all queued setter commands to the device in one write."""
+        try:
+            self._flush_batch()
+        finally:
+            self._pending = None
+            self._send = self.motherboard.send_command
+
+    @contextmanager
+    def batch(self):
+        """Context manager that wraps begin_batch() and end_batch()."""
+        self.begin_batch()
+        try:
+            yield self
+        finally:
+            self.end_batch()
 
     # --- SETTER Methods ---
     def set_mode(self, mode: int):
         """Sets the operational mode of the device."""
         self.mode = mode
-        self._send_command(1, mode)
+        self._send(self.device_id, Action.SET_MODE, mode)
 
     def set_frequency(self, frequency: int):
         """Sets the output frequency in Hz."""
         self.frequency = frequency
-        self._send_command(2, frequency)
+        self._send(self.device_id, Action.SET_FREQUENCY, frequency)
 
     def set_amplitude(self, amplitude: float):
         """Sets the output amplitude."""
         self.amplitude = amplitude
-        print("Setting amplitude to:", amplitude)
-        self._send_command(3, self._float_to_int(amplitude))
+        logger.debug("Setting amplitude to %s", amplitude)
+        self._send(
+            self.device_id, Action.SET_AMPLITUDE, _float_to_int(amplitude)
+        )
 
     def set_wiper(self, wiper: int):
         """Sets wiper position"""
         self.wiper = wiper
-        self._send_command(4, wiper)
+        self._send(self.device_id, Action.SET_WIPER, wiper)
 
     def set_startup_enabled(self, enabled: bool):
         """Configures whether the device is enabled on startup."""
         self.startup_enabled = enabled
-        self._send_command(11, int(enabled))
+        self._send(self.device_id, Action.SET_STARTUP_ENABLED, enabled)
 
     def set_vin(self, vin: float):
         self.vin = vin
-        self._send_command(12, self._float_to_int(vin))
+        self._send(self.device_id, Action.SET_VIN, _float_to_int(vin))
 
     def set_vout(self, vout: float):
         self.vout = vout
-        self._send_command(13, self._float_to_int(vout))
+        self._send(self.device_id, Action.SET_VOUT, _float_to_int(vout))
 
     def set_pot_range(self, pot_range: float):
         self.pot_range = pot_range
-        self._send_command(14, self._float_to_int(pot_range))
+        self._send(
+            self.device_id, Action.SET_POT_RANGE, _float_to_int(pot_range)
+        )
 
     def set_r_g_trim(self, trim: float):
         self.r_g_trim = trim
-        self._send_command(15, self._float_to_int(trim))
+        self._send(self.device_id, Action.SET_R_G_TRIM, _float_to_int(trim))
 
     def set_r_f_trim(self, trim: float):
         self.r_f_trim = trim
-        self._send_command(16, self._float_to_int(trim))
+        self._send(self.device_id, Action.SET_R_F_TRIM, _float_to_int(trim))
 
     def save_settings(self):
         """Saves the current settings to the device's non-volatile memory."""
-        self._send_command(17)
+        self._send(self.device_id, Action.SAVE_SETTINGS)
 
     def load_settings(self):
         """Loads settings from the device's non-volatile memory."""
-        self._send_command(18)
+        self._send(self.device_id, Action.LOAD_SETTINGS)
 
     # --- GETTER Methods ---
+    # These raise motherboard.TransportError if the device doesn't answer.
+    def _read_int_param(self, action: int, attr: str):
+        """Reads an integer parameter and caches it."""
+        value = self._send(self.device_id, action, 0, True)
+        setattr(self, attr, value)
+        return value
+
+    def _read_float_param(self, action: int, attr: str):
+        """Reads a float parameter and caches it."""
+        value = _int_to_float(self._send(self.device_id, action, 0, True))
+        setattr(self, attr, value)
+        return value
+
     def get_mode(self):
-        self.mode = self._send_command(21, read_response=True)
-        return self.mode
+        return self._read_int_param(Action.GET_MODE, "mode")
 
     def get_frequency(self):
-        response = self._send_command(22, read_response=True)
-        if response is not None:
-            self.frequency = response
-        return self.frequency
+        return self._read_int_param(Action.GET_FREQUENCY, "frequency")
 
     def get_amplitude(self):
-        response = self._send_command(23, read_response=True)
-        if response is not None:
-            self.amplitude = self._int_to_float(response)
-        return self.amplitude
+        return self._read_float_param(Action.GET_AMPLITUDE, "amplitude")
 
     def get_wiper(self):
-        response = self._send_command(24, read_response=True)
-        if response is not None:
-            self.wiper = response
-        return self.wiper
+        return self._read_int_param(Action.GET_WIPER, "wiper")
 
     def get_startup_enabled(self):
-        self.startup_enabled = self._send_command(31, read_response=True)
-        return self.startup_enabled
+        return self._read_int_param(
+            Action.GET_STARTUP_ENABLED, "startup_enabled"
+        )
 
     def get_vin(self):
-        response = self._send_command(32, read_response=True)
-        if response is not None:
-            self.vin = self._int_to_float(response)
-        return self.vin
+        return self._read_float_param(Action.GET_VIN, "vin")
 
     def get_vout(self):
-        response = self._send_command(33, read_response=True)
-        if response is not None:
-            self.vout = self._int_to_float(response)
-        return self.vout
+        return self._read_float_param(Action.GET_VOUT, "vout")
 
     def get_pot_range(self):
-        response = self._send_command(34, read_response=True)
-        if response is not None:
-            self.pot_range = self._int_to_float(response)
-        return self.pot_range
+        return self._read_float_param(Action.GET_POT_RANGE, "pot_range")
 
     def get_r_g_trim(self):
-        response = self._send_command(35, read_response=True)
-        if response is not None:
-            self.r_g_trim = self._int_to_float(response)
-        return self.r_g_trim
+        return self._read_float_param(Action.GET_R_G_TRIM, "r_g_trim")
 
     def get_r_f_trim(self):
-        response = self._send_command(36, read_response=True)
-        if response is not None:
-            self.r_f_trim = self._int_to_float(response)
-        return self.r_f_trim
+        return self._read_float_param(Action.GET_R_F_TRIM, "r_f_trim")
 
     def read_all_parameters(self):
-        """Reads all parameters from the device and updates the object's state."""
-        print(f"--- Reading all parameters for device {self.device_id} ---")
-        self.get_mode()
-        self.get_frequency()
-        self.get_amplitude()
-        self.get_startup_enabled()
-        self.get_vin()
-        self.get_vout()
-        self.get_pot_range()
-        self.get_r_g_trim()
-        self.get_r_f_trim()
-        self.get_wiper()
-        print("--- Finished reading ---")
+        """
+        Reads all parameters from the device and updates the object's state.
+        Raises motherboard.TransportError if the read fails.
+        """
+        logger.debug("Reading all parameters for device %d", self.device_id)
+        # This bypasses _send, so send queued setters first to keep order
+        if self._pending:
+            self._flush_batch()
+        responses = self.motherboard.send_command_batch(
+            self.device_id, _ALL_PARAMS_ACTIONS
+        )
+        (
+            self.mode,
+            self.frequency,
+            self.startup_enabled,
+            self.wiper,
+        ) = responses[:_NUM_INT_PARAMS]
+        (
+            self.amplitude,
+            self.vin,
+            self.vout,
+            self.pot_range,
+            self.r_g_trim,
+            self.r_f_trim,
+        ) = ints_to_floats(responses[_NUM_INT_PARAMS:])
+        logger.debug(
+            "Finished reading parameters for device %d", self.device_id
+        )
 
     def __repr__(self):
-        return (
-            f"NanoKicker(device_id={self.device_id}, "
-            f"mode={self.mode}, "
-            f"frequency={self.frequency}, "
-            f"amplitude={self.amplitude})"
+        return self._REPR_TMPL.format(
+            self.device_id, self.mode, self.frequency, self.amplitude
         )
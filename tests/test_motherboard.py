@@ -0,0 +1,119 @@
+import os
+import struct
+import sys
+import threading
+import time
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import motherboard
+from motherboard import Motherboard, TransportError
+
+ABSENT = b"\xfe\xff\xff\xff"
+
+
+class FakeSerial:
+    """Answers each command frame with a canned reply, optionally late."""
+
+    def __init__(self, port, timeout=1):
+        self.port = port
+        self.timeout = timeout
+        self.is_open = True
+        self.replies = {}  # device_id -> raw reply bytes (default: ABSENT)
+        self.delays = {}  # device_id -> seconds before the reply arrives
+        self._rx = bytearray()
+        self._late = []
+        # select() needs a real descriptor; this one is always readable
+        self._r, self._w = os.pipe()
+        os.write(self._w, b"x")
+
+    def fileno(self):
+        return self._r
+
+    def _deliver(self):
+        now = time.monotonic()
+        while self._late and self._late[0][0] <= now:
+            self._rx += self._late.pop(0)[1]
+
+    @property
+    def in_waiting(self):
+        self._deliver()
+        return len(self._rx)
+
+    def reset_input_buffer(self):
+        self._rx.clear()
+
+    def write(self, data):
+        for device_id, _, _ in struct.iter_unpack(">BBI", bytes(data)):
+            reply = self.replies.get(device_id, ABSENT)
+            delay = self.delays.get(device_id)
+            if delay:
+                self._late.append((time.monotonic() + delay, reply))
+            else:
+                self._rx += reply
+        return len(data)
+
+    def read(self, size=1):
+        self._deliver()
+        out = bytes(self._rx[:size])
+        del self._rx[:size]
+        return out
+
+    def close(self):
+        self.is_open = False
+        os.close(self._r)
+        os.close(self._w)
+
+
+class MotherboardTest(unittest.TestCase):
+    def setUp(self):
+        with mock.patch.object(motherboard.serial, "Serial", FakeSerial):
+            self.motherboard = Motherboard(port="/dev/fake")
+        self.serial = self.motherboard.serial
+        self.addCleanup(self.motherboard.disconnect)
+
+    def test_late_scan_reply_stays_with_pinged_device(self):
+        self.motherboard.SCAN_TIMEOUT = 0.005
+        self.serial.replies[3] = struct.pack(">I", 2)
+        self.serial.delays[3] = 0.02  # After SCAN_TIMEOUT, within SCAN_SETTLE
+
+        kickers = self.motherboard.scan_for_nanokickers()
+
+        self.assertEqual(list(kickers), [3])
+        self.assertEqual(kickers[3].mode, 2)
+
+    def test_error_replies_mean_no_device(self):
+        self.serial.replies[1] = ABSENT
+        self.serial.replies[2] = b"-2\r\n"
+        self.serial.replies[4] = struct.pack(">I", 1)
+
+        self.assertEqual(list(self.motherboard.scan_for_nanokickers()), [4])
+
+    def test_send_command_batch_raises_on_short_read(self):
+        self.serial.replies[3] = b"\x00\x00"  # Half a response per command
+
+        with self.assertRaises(TransportError):
+            self.motherboard.send_command_batch(3, [21, 22])
+
+    def test_exchanges_wait_for_the_port_lock(self):
+        self.serial.replies[3] = struct.pack(">I", 7)
+        results = []
+        other = threading.Thread(
+            target=lambda: results.append(
+                self.motherboard.send_command_batch(3, [21, 22])
+            )
+        )
+
+        with self.motherboard._lock:
+            other.start()
+            other.join(0.05)
+            self.assertEqual(results, [])
+        other.join()
+
+        self.assertEqual(results, [(7, 7)])
+
+
+if __name__ == "__main__":
+    unittest.main()
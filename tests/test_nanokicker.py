@@ -0,0 +1,76 @@
+import os
+import struct
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from nanokicker import Action, NanoKicker
+
+
+class FakeMotherboard:
+    """Records commands instead of writing them to a serial port."""
+
+    def __init__(self):
+        self.sent = []
+        self.batches = []
+        self.mode = 0  # What the device holds, as set by SET_MODE
+
+    def send_command(self, device_id, action, value=0, read_response=False):
+        struct.pack(">BBI", device_id, action, value)
+        self.sent.append((action, value))
+
+    def submit_batch(self, device_id, entries):
+        for action, value in entries:
+            struct.pack(">BBI", device_id, action, value)
+        self.batches.append(list(entries))
+        for action, value in entries:
+            if action == Action.SET_MODE:
+                self.mode = value
+
+    def send_command_batch(self, device_id, actions):
+        return tuple(
+            self.mode if action == Action.GET_MODE else 0 for action in actions
+        )
+
+
+class BatchTest(unittest.TestCase):
+    def setUp(self):
+        self.motherboard = FakeMotherboard()
+        self.kicker = NanoKicker(device_id=3, motherboard=self.motherboard)
+
+    def test_batch_sends_setters_in_one_write(self):
+        with self.kicker.batch():
+            self.kicker.set_mode(1)
+            self.kicker.set_wiper(5)
+
+        self.assertEqual(
+            self.motherboard.batches,
+            [[(Action.SET_MODE, 1), (Action.SET_WIPER, 5)]],
+        )
+        self.assertEqual(self.motherboard.sent, [])
+
+    def test_failed_batch_does_not_leave_kicker_batching(self):
+        # A negative wiper can't be packed as an unsigned value
+        with self.assertRaises(struct.error):
+            with self.kicker.batch():
+                self.kicker.set_wiper(-5)
+
+        self.kicker.set_mode(1)
+        self.assertEqual(self.motherboard.sent, [(Action.SET_MODE, 1)])
+
+        with self.kicker.batch():
+            self.kicker.set_mode(2)
+        self.assertEqual(self.motherboard.batches, [[(Action.SET_MODE, 2)]])
+
+    def test_read_all_parameters_sends_queued_setters_first(self):
+        with self.kicker.batch():
+            self.kicker.set_mode(3)
+            self.kicker.read_all_parameters()
+            self.assertEqual(self.kicker.mode, 3)
+
+        self.assertEqual(self.motherboard.batches, [[(Action.SET_MODE, 3)]])
+
+
+if __name__ == "__main__":
+    unittest.main()